@@ -20,14 +20,362 @@ globally.
 
     nbpandoc <filename>.ipynb
 
+While iterating on a document, ``--draft`` makes the conversion faster at the
+cost of a larger PDF: the LaTeX engine runs in batch mode and, for XeLaTeX,
+the PDF is written without compression, which dominates the conversion time of
+image-heavy notebooks.
+
+.. code-block:: shell
+
+    nbpandoc --draft <filename>.ipynb
+
 See the document for more details.
 """
 
 import argparse
+import concurrent.futures
+import contextlib
+import functools
+import glob
+import hashlib
 import subprocess
 import json
+import logging
+import mmap
+import multiprocessing
 import os
+import re
+import shlex
+import shutil
+import sys
 import tempfile
+import threading
+import time
+import warnings
+
+# ``orjson`` is an optional speed-up for decoding and encoding metadata; the
+# standard ``json`` module is used when it is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+log = logging.getLogger("nbpandoc")
+
+
+# Matches either a complete JSON string literal (escapes included) or a single
+# structural bracket. Everything else in a notebook (numbers, commas, colons,
+# whitespace) is irrelevant for locating the top-level ``"metadata"`` object.
+# Both work on bytes, so that they can scan a memory-mapped notebook in place.
+_JSON_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]')
+_JSON_COLON = re.compile(rb"\s*:\s*")
+
+# Top-level notebook metadata keys that mean nothing to Pandoc: the ones
+# consumed by nbpandoc itself, and the ones written by Jupyter and common
+# front-ends or extensions. They are left out of the ``--metadata-file``.
+_NON_PANDOC_METADATA_KEYS = frozenset({
+    # nbpandoc
+    "output",
+    "pandoc_args",
+    # Jupyter and front-ends
+    "accelerator",
+    "anaconda-cloud",
+    "celltoolbar",
+    "colab",
+    "interpreter",
+    "jupytext",
+    "kaggle",
+    "kernelspec",
+    "language_info",
+    "latex_envs",
+    "nbTranslate",
+    "papermill",
+    "varInspector",
+    "vscode",
+    "widgets",
+})
+
+# Keys that are also Pandoc template variables, and are only dropped when they
+# hold a front-end's configuration object: ``"toc": true`` asks Pandoc for a
+# table of contents, while ``"toc": {...}`` is the settings of Jupyter's toc2
+# extension.
+_NON_PANDOC_METADATA_OBJECT_KEYS = frozenset({"toc"})
+
+# Pandoc flags used when none are given.
+_DEFAULT_FLAGS = ("--pdf-engine=xelatex",)
+
+# Input extensions ``convert_to_pdf`` accepts: Jupyter notebooks and the usual
+# spellings of Markdown files.
+_NOTEBOOK_EXTENSIONS = (".ipynb",)
+_MARKDOWN_EXTENSIONS = (".md", ".markdown", ".mdown", ".mkd", ".mkdn")
+
+# Inputs larger than this (in MiB) are refused by default, rather than risking
+# Pandoc exhausting memory on them. ``0`` disables the check.
+_DEFAULT_MAX_SIZE = 50
+
+# ``--pdf-engine-opt`` values added in draft mode, by PDF engine. Every engine
+# runs in batch mode; XeLaTeX additionally hands its output to ``xdvipdfmx``
+# with compression disabled, which is where most of its time goes on
+# image-heavy documents. (``-draftmode`` is not used for pdfLaTeX, since Pandoc
+# would then get no PDF at all.)
+_DRAFT_ENGINE_OPTS = {
+    "xelatex": ("-output-driver=xdvipdfmx -z0", "-interaction=batchmode"),
+    "pdflatex": ("-interaction=batchmode",),
+    "lualatex": ("-interaction=batchmode",),
+}
+
+# Pandoc's PDF engine when no ``--pdf-engine`` is given.
+_PANDOC_DEFAULT_PDF_ENGINE = "pdflatex"
+
+# Prefix of the temporary directories created by ``metadata_as_file``, and the
+# age after which leftovers of killed runs are removed (one week).
+_TEMP_DIR_PREFIX = "nbpandoc-"
+_TEMP_DIR_MAX_AGE = 7 * 24 * 60 * 60
+
+# ``--name=`` prefixes of the options nbpandoc emits most often, interned once
+# so that every command built in a batch shares the same string objects.
+_CLI_PREFIXES = {
+    name: sys.intern(f"--{name}=")
+    for name in (
+        "pdf-engine",
+        "to",
+        "output",
+        "metadata-file",
+        "from",
+        "standalone",
+        "filter",
+        "lua-filter",
+        "include-in-header",
+    )
+}
+
+# Translation table turning underscore_style option names into hyphen-style.
+_UNDERSCORE_TO_HYPHEN = str.maketrans("_", "-")
+
+
+# Compact encoder reused for every list-valued pandoc_args item when ``orjson``
+# is not available, instead of ``json.dumps`` building a new one per call.
+_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _json_loads(text):
+    """
+    Decodes a JSON document, using ``orjson`` when it is available.
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _json_dumps(obj, indent=False):
+    """
+    Encodes ``obj`` as UTF-8 JSON bytes, using ``orjson`` when it is available.
+    Non-ASCII characters are written as-is rather than escaped.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return _JSON_ENCODER.encode(obj).encode("utf-8")
+
+
+def _closing_bracket(text, start):
+    """
+    Scans ``text`` from ``start`` and returns the index just past the first
+    bracket that closes a level opened before ``start``, or ``None`` if the
+    document ends first.
+    """
+    depth = 0
+    for match in _JSON_TOKEN.finditer(text, start):
+        token = match.group()
+        if token in b"{[":
+            depth += 1
+        elif token in b"}]":
+            depth -= 1
+            if depth < 0:
+                return match.end()
+    return None
+
+
+def _opens_container(text, index):
+    """
+    Tells whether an object or an array starts at ``index`` in ``text``.
+    """
+    return text[index:index + 1] in (b"{", b"[")
+
+
+def _top_level_colons(text, target):
+    """
+    Walks the whole document and yields, for every occurrence of the raw key
+    literal ``target`` at depth one (i.e. a key of the root object), the match
+    of the colon that follows it.
+    """
+    depth = 0
+    for match in _JSON_TOKEN.finditer(text):
+        token = match.group()
+        if token in b"{[":
+            depth += 1
+        elif token in b"}]":
+            depth -= 1
+        elif depth == 1 and token == target:
+            colon = _JSON_COLON.match(text, match.end())
+            if colon:
+                yield colon
+
+
+def _slice_top_level_value(text, key):
+    """
+    Locates the value of a top-level ``key`` in a JSON object without decoding
+    the rest of the document. The scan only tracks bracket depth and skips over
+    string literals, so large cell sources and base64 encoded outputs are never
+    turned into Python objects.
+
+    Notes
+    -----
+
+    ``nbformat`` writes the top-level keys sorted, so ``"metadata"`` normally
+    follows the ``"cells"`` array and is the last occurrence of the key in the
+    file. That occurrence is tried first, and it is accepted if what follows its
+    value closes exactly one level, i.e. the root object. Otherwise the whole
+    document is scanned from the beginning.
+
+    Parameters
+    ----------
+    text : bytes\, mmap.mmap or other bytes-like object
+        The raw UTF-8 JSON document, whose root is expected to be an object.
+    key : str
+        The top-level key to look for. It is compared against the raw string
+        literal, so it must not contain characters that need escaping.
+
+    Returns
+    -------
+    bytes or None
+        The JSON text of the value if it is an object or an array, ``None`` if
+        the key is not found or its value is a scalar.
+    """
+    target = f'"{key}"'.encode("utf-8")
+
+    # Fast path: the last occurrence of the key.
+    index = text.rfind(target)
+    if index < 0:
+        return None
+    escaped = False
+    i = index
+    while i and text[i - 1:i] == b"\\":
+        escaped = not escaped
+        i -= 1
+    colon = _JSON_COLON.match(text, index + len(target))
+    if not escaped and colon and _opens_container(text, colon.end()):
+        end = _closing_bracket(text, colon.end() + 1)
+        root = None if end is None else _closing_bracket(text, end)
+        if root is not None and not text[root:].strip():
+            return text[colon.end():end]
+
+    # Slow path: walk the document and only consider keys at depth one.
+    for colon in _top_level_colons(text, target):
+        if _opens_container(text, colon.end()):
+            end = _closing_bracket(text, colon.end() + 1)
+            return None if end is None else text[colon.end():end]
+    return None
+
+
+def _metadata_cache_path(path):
+    """
+    Returns the path of the on-disk metadata cache entry for a notebook. There
+    is one entry per notebook path, so editing a notebook overwrites its entry
+    instead of piling up new ones.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    digest = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_home, "nbpandoc", f"metadata-{digest}.json")
+
+
+def _has_nbformat(text):
+    """
+    Tells whether a notebook's JSON text declares its ``"nbformat"`` version,
+    which every Jupyter notebook does. Like the metadata scan, the last
+    occurrence of the key is checked first, since ``nbformat`` writes it after
+    ``"cells"``. If that is not it (e.g. the file starts with ``"nbformat"``,
+    as Colab writes them, and a cell later contains the string), the keys of
+    the root object are walked.
+    """
+    target = b'"nbformat"'
+    index = text.rfind(target)
+    if index < 0:
+        return False
+    colon = _JSON_COLON.match(text, index + len(target))
+    if colon and text[colon.end():colon.end() + 1].isdigit():
+        return True
+    return any(
+        text[colon.end():colon.end() + 1].isdigit()
+        for colon in _top_level_colons(text, target)
+    )
+
+
+def _read_notebook_metadata(path):
+    """
+    Reads the top-level metadata of a notebook from disk, raising on any error,
+    including a ``ValueError`` if the file does not look like a notebook.
+
+    The file is memory-mapped rather than read, so the scan runs over the page
+    cache and the notebook is never copied into a Python object as a whole;
+    only the metadata slice is.
+    """
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as text:
+            if not _has_nbformat(text):
+                raise ValueError("no nbformat version found")
+            raw = _slice_top_level_value(text, "metadata")
+    if raw is None:
+        return {}
+    return _json_loads(raw) or {}
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_metadata(path, mtime_ns, size):
+    """
+    Memoizes the metadata of a notebook by path, modification time and size, so
+    that converting the same unchanged notebook again skips parsing it.
+
+    Besides the in-process cache, the result is persisted under
+    ``$XDG_CACHE_HOME/nbpandoc`` (``~/.cache/nbpandoc`` by default), validated
+    by a SHA-256 of the modification time, the size and the first 4 KiB of the
+    file, so that a fresh process converting an unchanged notebook also hits.
+    The on-disk cache is best-effort: any error reading or writing it is
+    ignored.
+    """
+    with open(path, "rb") as f:
+        head = f.read(4096)
+    stamp = f"{mtime_ns}:{size}:".encode("ascii")
+    key = hashlib.sha256(stamp + head).hexdigest()
+    cache_file = _metadata_cache_path(path)
+
+    try:
+        with open(cache_file, "rb") as f:
+            entry = _json_loads(f.read())
+        if entry.get("key") == key:
+            return entry["metadata"]
+    except Exception:
+        pass
+
+    metadata = _read_notebook_metadata(path)
+
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_json_dumps({"key": key, "metadata": metadata}))
+        os.replace(tmp, cache_file)
+    except Exception:
+        pass
+
+    return metadata
 
 
 def extract_notebook_metadata(filename):
@@ -44,6 +392,12 @@ def extract_notebook_metadata(filename):
       invalid JSON format).
     * The metadata section is optional in Jupyter notebooks, so it may not 
       always be present.
+    * Only the top-level ``"metadata"`` object is decoded. The ``"cells"``
+      array, which holds the sources and (possibly huge) outputs, is skipped
+      over without being parsed into Python objects.
+    * Results are cached by path, modification time and size, both in memory
+      and under ``~/.cache/nbpandoc``, so an unchanged notebook is only parsed
+      once. A shallow copy is returned, so callers may modify it freely.
 
     Parameters
     ----------
@@ -58,39 +412,163 @@ def extract_notebook_metadata(filename):
         returned.
     """
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            nb = json.load(f)
-        return nb.get("metadata", {}) or {}
+        st = os.stat(filename)
+        metadata = _cached_metadata(filename, st.st_mtime_ns, st.st_size)
+        return dict(metadata)
     except Exception:
         return {}
 
 
-def write_metadata_to_file(metadata):
+def pandoc_metadata(metadata):
+    """
+    Selects the part of a notebook's metadata that is meant for Pandoc, i.e.
+    everything but the keys in ``_NON_PANDOC_METADATA_KEYS``, and the keys in
+    ``_NON_PANDOC_METADATA_OBJECT_KEYS`` whose value is an object (such as the
+    toc2 extension's ``"toc"`` settings, whereas ``"toc": true`` is kept).
+    User-authored keys, including arbitrary template variables such as
+    ``documentclass`` or ``geometry``, are kept.
+
+    Parameters
+    ----------
+    metadata : dict
+        The metadata dictionary of a Jupyter notebook.
+
+    Returns
+    -------
+    dict
+        A new dictionary with the keys to be written to the metadata file. It is
+        empty if the notebook carries no metadata relevant to Pandoc, e.g. only
+        the ``kernelspec`` and ``language_info`` written by Jupyter.
+    """
+    return {
+        key: value
+        for key, value in metadata.items()
+        if key not in _NON_PANDOC_METADATA_KEYS
+        and not (
+            key in _NON_PANDOC_METADATA_OBJECT_KEYS and isinstance(value, dict)
+        )
+    }
+
+
+def write_metadata_to_file(metadata, directory=None):
     """
     The function ``write_metadata_to_file`` writes a metadata dictionary to a 
-    temporary JSON file for pandoc.
+    JSON file for pandoc.
 
     Parameters
     ----------
     metadata : dict
         The ``metadata`` parameter is a dictionary containing information that 
-        needs to be written to a temporary JSON file for use with Pandoc. This 
-        metadata could include details such as document title, author, date, and
-        any other relevant information needed for document processing. 
+        needs to be written to a JSON file for use with Pandoc. This metadata
+        could include details such as document title, author, date, and any
+        other relevant information needed for document processing. 
+    directory : str\, optional
+        The directory the file is written to, typically a temporary directory
+        whose lifetime is managed by the caller. If omitted, a new temporary
+        directory is created for it, as the function used to do; removing it
+        is then up to the caller, otherwise ``sweep_stale_temp_dirs`` removes
+        it after a week.
 
     Returns
     -------
     str
         The function ``write_metadata_to_file`` returns the path to the
-        temporary metadata file that was created and written with the provided 
-        metadata dictionary.
+        metadata file that was created and written with the provided metadata
+        dictionary.
+    """
+    if directory is None:
+        directory = tempfile.mkdtemp(prefix=_TEMP_DIR_PREFIX)
+    path = os.path.join(directory, "metadata.json")
+    with open(path, "wb") as f:
+        f.write(_json_dumps(metadata, indent=True))
+    return path
+
+
+def _write_all(fd, data):
+    """
+    Writes ``data`` to the file descriptor ``fd`` and closes it. A reader that
+    goes away early (e.g. Pandoc failing before reading its metadata) is not an
+    error.
+    """
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def metadata_as_file(metadata):
     """
-    tmp = tempfile.NamedTemporaryFile(
-        delete=False, suffix=".json", mode="w", encoding="utf-8"
+    Makes a metadata dictionary available to Pandoc as a file path, for use
+    with ``--metadata-file``, and cleans up after itself on exit.
+
+    On POSIX systems providing ``/dev/fd``, the JSON is fed through a pipe by a
+    background thread and nothing touches the disk; the read end of the pipe
+    has to be passed to the Pandoc process through ``pass_fds``. Elsewhere
+    (notably on Windows), the metadata is written into a temporary directory
+    that is removed when the context exits.
+
+    Parameters
+    ----------
+    metadata : dict
+        The metadata dictionary to hand over to Pandoc.
+
+    Yields
+    ------
+    tuple
+        ``(path, pass_fds)``, the path to give to ``--metadata-file`` and the
+        tuple of file descriptors the Pandoc process must inherit.
+    """
+    if os.name != "posix" or not os.path.isdir("/dev/fd"):
+        with tempfile.TemporaryDirectory(prefix=_TEMP_DIR_PREFIX) as directory:
+            yield write_metadata_to_file(metadata, directory), ()
+        return
+
+    read_fd, write_fd = os.pipe()
+    writer = threading.Thread(
+        target=_write_all, args=(write_fd, _json_dumps(metadata, indent=True)),
+        daemon=True,
     )
-    json.dump(metadata, tmp, ensure_ascii=False, indent=2)
-    tmp.close()
-    return tmp.name
+    writer.start()
+    try:
+        yield f"/dev/fd/{read_fd}", (read_fd,)
+    finally:
+        # Once our copy of the read end is closed, a writer still blocked on
+        # an unread pipe gets EPIPE and finishes.
+        os.close(read_fd)
+        writer.join()
+
+
+def sweep_stale_temp_dirs(max_age=_TEMP_DIR_MAX_AGE):
+    """
+    Removes temporary directories left behind by ``metadata_as_file`` when a
+    previous run was killed before it could clean up. This is best-effort:
+    errors are ignored.
+
+    Notes
+    -----
+
+    Only directories with nbpandoc's own prefix are considered. Files created
+    by other programs in the temporary directory are never touched.
+
+    Parameters
+    ----------
+    max_age : float\, optional
+        Minimum age in seconds, based on the modification time, for a directory
+        to be removed, defaults to one week.
+    """
+    cutoff = time.time() - max_age
+    pattern = os.path.join(tempfile.gettempdir(), f"{_TEMP_DIR_PREFIX}*")
+    for path in glob.glob(pattern):
+        try:
+            if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
 
 
 def replace_underscore_with_hyphen(options):        
@@ -111,10 +589,94 @@ def replace_underscore_with_hyphen(options):
     dict
         A new dictionary with the keys converted to hyphen-style.
     """
-    return {key.replace("_", "-"): value for key, value in options.items()}
+    return {
+        key.translate(_UNDERSCORE_TO_HYPHEN): value
+        for key, value in options.items()
+    }
 
 
-def apppend_pandoc_arguments(pandoc_args, command):
+def split_arguments(text):
+    """
+    Splits a string of command-line arguments the way a shell would, so that
+    quoted values such as ``--metadata title='hello world'`` stay together.
+    Unlike ``shlex.split``, backslashes are kept as-is, so that Windows paths
+    survive.
+
+    Parameters
+    ----------
+    text : str
+        The arguments to split.
+
+    Returns
+    -------
+    list
+        The individual arguments.
+
+    Raises
+    ------
+    ValueError
+        "No closing quotation" if ``text`` has unbalanced quotes.
+    """
+    lexer = shlex.shlex(text, posix=True)
+    lexer.whitespace_split = True
+    lexer.commenters = ""
+    lexer.escape = ""
+    return list(lexer)
+
+
+@functools.singledispatch
+def _iter_pandoc_args(pandoc_args):
+    """
+    Yields the command-line arguments described by ``pandoc_args``, one string
+    at a time, so that they can be added to a command with a single
+    ``list.extend``. See ``append_pandoc_arguments`` for the accepted forms.
+
+    The implementation is picked by the type of ``pandoc_args``; this fallback
+    handles unsupported types.
+    """
+    raise ValueError(f"Invalid pandoc_args: {pandoc_args!r}")
+
+
+@_iter_pandoc_args.register(dict)
+def _(pandoc_args):
+    # Dict: convert keys and values. The hyphen-style option names are built
+    # directly here rather than through ``replace_underscore_with_hyphen``, to
+    # avoid an intermediate dictionary.
+    for key, value in pandoc_args.items():
+        name = key.translate(_UNDERSCORE_TO_HYPHEN)
+        prefix = _CLI_PREFIXES.get(name) or f"--{name}="
+
+        # List of strings: repeat the option for every item, e.g. one
+        # ``--lua-filter=...`` per filter
+        if isinstance(value, list) and all(
+            isinstance(item, str) for item in value
+        ):
+            for item in value:
+                yield prefix + item
+        # Other list value: JSON-style
+        elif isinstance(value, list):
+            yield prefix + _json_dumps(value).decode("utf-8")
+        else:
+            yield f"{prefix}{value}"
+
+
+@_iter_pandoc_args.register(str)
+def _(pandoc_args):
+    # String: split into flags
+    yield from split_arguments(pandoc_args)
+
+
+@_iter_pandoc_args.register(list)
+def _(pandoc_args):
+    # List of strings: each is a flag
+    for item in pandoc_args:
+        if isinstance(item, str):
+            yield from split_arguments(item)
+        else:
+            raise ValueError(f"Invalid pandoc_args item: {item}")
+
+
+def append_pandoc_arguments(pandoc_args, command):
     """
     Analyzes and processes the Pandoc arguments provided in the JSON metadata of
     a Jupyter Notebook file and extends the given command list accordingly.
@@ -125,9 +687,15 @@ def apppend_pandoc_arguments(pandoc_args, command):
         The Pandoc arguments to be processed. It can be:
         
         * A dictionary where keys are argument names and values are their
-          corresponding values.
-        * A string containing space-separated Pandoc flags.
-        * A list of strings, where each string is a Pandoc flag or argument.
+          corresponding values. A list of strings as value repeats the
+          argument once per item, other lists are passed as JSON.
+        * A string containing space-separated Pandoc flags, split with shell
+          quoting rules (see ``split_arguments``). Quotes must therefore be
+          balanced: unlike the plain whitespace split used before, a lone
+          apostrophe, as in ``--metadata=author=O'Brien``, is an error and has
+          to be quoted, e.g. ``"--metadata=author=O'Brien"``.
+        * A list of strings, where each string is a Pandoc flag or argument,
+          split the same way.
     command : list
         The list of command-line arguments to which the processed Pandoc
         arguments will be appended.
@@ -136,43 +704,127 @@ def apppend_pandoc_arguments(pandoc_args, command):
     -------
     list
         The updated command list with the processed Pandoc arguments appended.
-        If an invalid item is encountered in the ``pandoc_args`` list or if the
-        ``pandoc_args`` type is unsupported.
 
     Raises
     ------
     ValueError
-        "Invalid pandoc_args item: {item}" if an item in ``pandoc_args`` is not
-        an instance of class or of a subclass thereof.
-    """
-    # Dict: convert keys and values
-    if isinstance(pandoc_args, dict):
-        pandoc_args = replace_underscore_with_hyphen(pandoc_args)
-        for key, value in pandoc_args.items():
-            cli_key = f"--{key}"
-
-            # List value: JSON-style
-            if isinstance(value, list):
-                command.append(
-                    f"{cli_key}={json.dumps(value, ensure_ascii=False)}"
-                )
-            else:
-                command.append(f"{cli_key}={value}")
-    # String: split into flags
-    elif isinstance(pandoc_args, str):
-        command.extend(pandoc_args.split())
-    # List of strings: each is a flag
-    elif isinstance(pandoc_args, list):
-        for item in pandoc_args:
-            if isinstance(item, str):
-                command.extend(item.split())
-            else:
-                raise ValueError(f"Invalid pandoc_args item: {item}")
-
+        "Invalid pandoc_args item: {item}" if an item in a ``pandoc_args`` list
+        is not a string, "Invalid pandoc_args: {pandoc_args}" if
+        ``pandoc_args`` is of an unsupported type, or "No closing quotation" if
+        a string has unbalanced quotes.
+    """
+    command.extend(_iter_pandoc_args(pandoc_args))
     return command
 
 
-def convert_to_pdf(filename, flags="--pdf-engine=xelatex"):
+def apppend_pandoc_arguments(pandoc_args, command):
+    """
+    Deprecated misspelling of ``append_pandoc_arguments``, kept so that existing
+    callers keep working.
+    """
+    warnings.warn(
+        "apppend_pandoc_arguments is deprecated, use append_pandoc_arguments",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    return append_pandoc_arguments(pandoc_args, command)
+
+
+@functools.lru_cache(maxsize=None)
+def _pandoc_executable():
+    """
+    Resolves the ``pandoc`` executable on ``PATH`` once per process, so that
+    converting several files does not repeat the lookup for every spawn.
+    Returns ``None`` if Pandoc cannot be found.
+    """
+    return shutil.which("pandoc")
+
+
+def validate_input(filename, max_size=_DEFAULT_MAX_SIZE):
+    """
+    Checks an input file before any Pandoc process is spawned for it, so that
+    a bad input fails fast instead of after Pandoc's startup.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the input file.
+    max_size : int\, optional
+        Maximum size of the input in MiB, ``0`` or ``None`` for no limit,
+        defaults to 50.
+
+    Returns
+    -------
+    str or None
+        A message describing the problem, or ``None`` if the input looks fine.
+        The input is rejected if it cannot be read, has an unsupported
+        extension, exceeds ``max_size``, or is a ``.ipynb`` file that does not
+        look like a Jupyter notebook: it has no ``"nbformat"`` version, or its
+        top-level metadata is not valid JSON. Only the metadata is decoded, so
+        malformed JSON elsewhere in a notebook (e.g. in its cells) is not
+        detected here and is left for Pandoc to report.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in _NOTEBOOK_EXTENSIONS + _MARKDOWN_EXTENSIONS:
+        return f"unsupported input type '{ext}' (expected .md or .ipynb)"
+
+    try:
+        st = os.stat(filename)
+    except OSError as e:
+        return f"cannot read {filename}: {e.strerror}"
+
+    if max_size and st.st_size > max_size * 1024 * 1024:
+        return (
+            f"{filename} is {st.st_size / (1024 * 1024):.1f} MiB, larger than "
+            f"the {max_size} MiB limit (see --max-size)"
+        )
+
+    if ext in _NOTEBOOK_EXTENSIONS:
+        # This also primes the metadata cache for the conversion itself.
+        try:
+            _cached_metadata(filename, st.st_mtime_ns, st.st_size)
+        except Exception as e:
+            return f"{filename} is not a valid Jupyter notebook: {e}"
+
+    return None
+
+
+def draft_engine_options(command):
+    """
+    Returns the ``--pdf-engine-opt`` arguments that put the PDF engine of a
+    Pandoc command in draft mode (see ``_DRAFT_ENGINE_OPTS``). The engine is
+    the one of the last ``--pdf-engine`` argument, so that options coming from
+    the notebook metadata take precedence over the CLI flags, as they do for
+    Pandoc itself.
+
+    Parameters
+    ----------
+    command : list
+        The Pandoc command, including all of its flags.
+
+    Returns
+    -------
+    list
+        The arguments to append to ``command``, empty if the engine has no
+        known draft options.
+    """
+    prefix = _CLI_PREFIXES["pdf-engine"]
+    engine = _PANDOC_DEFAULT_PDF_ENGINE
+    for argument, following in zip(command, command[1:] + [None]):
+        if argument.startswith(prefix):
+            engine = argument[len(prefix):]
+        elif argument == "--pdf-engine" and following is not None:
+            engine = following
+    engine = os.path.splitext(re.split(r"[\\/]", engine)[-1])[0].lower()
+    return [
+        f"--pdf-engine-opt={option}"
+        for option in _DRAFT_ENGINE_OPTS.get(engine, ())
+    ]
+
+
+def convert_to_pdf(
+    filename, flags=None, max_size=_DEFAULT_MAX_SIZE, draft=False
+):
     """
     The ``convert_to_pdf`` function converts a Markdown or Jupyter notebook file 
     to PDF using Pandoc with customizable flags based on metadata handling.
@@ -183,15 +835,38 @@ def convert_to_pdf(filename, flags="--pdf-engine=xelatex"):
         The ``filename`` parameter in the ``convert_to_pdf`` function is a
         string that represents the path to the input file. This file can be 
         either a Markdown file (``.md``) or a Jupyter notebook file (``.ipynb``)
-    flags : str\, optional
+    flags : list\, tuple or str\, optional
         The ``flags`` parameter in the ``convert_to_pdf`` function is an 
-        optional string that allows you to specify extra Pandoc flags to include
-        during the conversion process. By default, the ``flags`` parameter is 
-        set to ``--pdf-engine=xelatex``, but you can provide additional flags 
-        as, defaults to ``--pdf-engine=xelatex`` (optional)
+        optional sequence of extra Pandoc flags to include during the
+        conversion process. When converting many files, split the flags once
+        and pass the same list to every call. A string is also accepted and
+        split with ``split_arguments``. Defaults to ``_DEFAULT_FLAGS``, i.e.
+        ``--pdf-engine=xelatex`` (optional)
+    max_size : int\, optional
+        Inputs larger than this many MiB are refused without running Pandoc,
+        ``0`` or ``None`` disables the check, defaults to 50. See
+        ``validate_input``.
+    draft : bool\, optional
+        Trades output size for speed by passing draft options to the PDF
+        engine, see ``draft_engine_options``, defaults to ``False``.
+
+    Returns
+    -------
+    bool
+        ``True`` if Pandoc ran successfully, ``False`` otherwise.
     """
 
-    base, _ = os.path.splitext(filename)
+    error = validate_input(filename, max_size)
+    if error:
+        log.error("Error during conversion: %s", error)
+        return False
+
+    base, ext = os.path.splitext(filename)
+    is_ipynb = ext.lower() in _NOTEBOOK_EXTENSIONS
+
+    # Only known for notebooks; for other inputs the output is whatever the
+    # CLI flags tell Pandoc.
+    output_file = None
 
     # Note that finally I decide not to give any presupposed pandoc option, and
     # all the flags should be specified in the ``"pandoc_args"`` flag. This 
@@ -200,9 +875,14 @@ def convert_to_pdf(filename, flags="--pdf-engine=xelatex"):
 
     # output_filename = f"{base}.pdf"
 
+    pandoc = _pandoc_executable()
+    if pandoc is None:
+        log.error("Error during conversion: pandoc was not found in PATH")
+        return False
+
     # Base command
     command = [
-        "pandoc",
+        pandoc,
         filename,
         # "--standalone",
         # "--to=pdf",
@@ -210,60 +890,253 @@ def convert_to_pdf(filename, flags="--pdf-engine=xelatex"):
     ]
 
     # Include CLI flags
-    if flags:
-        command.extend(flags.split())
-
-    # If input is a Jupyter notebook, process metadata
-    if filename.lower().endswith(".ipynb"):
-        metadata = extract_notebook_metadata(filename)
-        # Write full metadata to file for Pandoc
-        if metadata:
-            meta_file = write_metadata_to_file(metadata)
-            command.append(f"--metadata-file={meta_file}")
-
-        # Here we're going to test whether ``"output"`` is specified in Jupyter
-        # metadata. If not, it will be ``"{base}.pdf"``.
-        output_file = metadata.get("output")
-        if output_file == None:
-            output_file = f"{base}.pdf"
-            command.append(f"--to=pdf")
-            command.append(f"--output={output_file}")
-
-        # Process custom pandoc_args
-        pandoc_args = metadata.get("pandoc_args")
-        if pandoc_args:
-            command = apppend_pandoc_arguments(pandoc_args, command)
-
-    # Execute the Pandoc command
-    try:
-        print("Executing command: ", command)
-        subprocess.run(command, check=True)
-        print(f"Successfully converted {filename} to {output_file}")
-    except subprocess.CalledProcessError as e:
-        print(f"Error during conversion: {e}")
+    if flags is None:
+        flags = _DEFAULT_FLAGS
+    elif isinstance(flags, str):
+        flags = split_arguments(flags)
+    command.extend(flags)
 
+    # File descriptors the Pandoc process must inherit, see
+    # ``metadata_as_file``.
+    pass_fds = ()
 
-def main():
+    with contextlib.ExitStack() as stack:
+        # If input is a Jupyter notebook, process metadata
+        if is_ipynb:
+            metadata = extract_notebook_metadata(filename)
+            # Write the metadata meant for Pandoc to a file, if there is any
+            emit = pandoc_metadata(metadata)
+            if emit:
+                meta_file, pass_fds = stack.enter_context(
+                    metadata_as_file(emit)
+                )
+                command.append(_CLI_PREFIXES["metadata-file"] + meta_file)
+
+            # Here we're going to test whether ``"output"`` is specified in
+            # Jupyter metadata. If not, it will be ``"{base}.pdf"``.
+            output_file = metadata.get("output")
+            if output_file is None:
+                output_file = f"{base}.pdf"
+                command.extend(
+                    ("--to=pdf", _CLI_PREFIXES["output"] + output_file)
+                )
+
+            # Process custom pandoc_args
+            pandoc_args = metadata.get("pandoc_args")
+            if pandoc_args:
+                try:
+                    command = append_pandoc_arguments(pandoc_args, command)
+                except ValueError as e:
+                    log.error(
+                        "Error during conversion: pandoc_args of %s: %s",
+                        filename,
+                        e,
+                    )
+                    return False
+
+        if draft:
+            command.extend(draft_engine_options(command))
+
+        # Execute the Pandoc command. It is spawned directly, without a shell,
+        # and once per document: Pandoc reads a single document from its input
+        # until EOF and writes a single output, so one long-lived process
+        # cannot be fed several notebooks, and ``pandoc server`` cannot run the
+        # LaTeX engine. Batches are sped up by ``--jobs`` instead.
+        try:
+            log.debug("Executing command: %r", command)
+            # Pandoc never reads its standard input here (the input is always a
+            # file), so it gets none: a LaTeX engine stopping at an error
+            # prompt fails right away instead of waiting on the terminal. The
+            # environment is inherited as-is, since Pandoc and TeX depend on
+            # many variables (TEXMF*, APPDATA, SYSTEMROOT, TEMP, ...).
+            subprocess.run(
+                command,
+                check=True,
+                stdin=subprocess.DEVNULL,
+                close_fds=True,
+                pass_fds=pass_fds,
+            )
+            log.info(
+                "Successfully converted %s to %s",
+                filename,
+                output_file or "(pandoc-default)",
+            )
+        except subprocess.CalledProcessError as e:
+            log.error("Error during conversion: %s", e)
+            return False
+    return True
+
+
+def _configure_logging(level):
+    """
+    Sends the messages of the ``nbpandoc`` logger at ``level`` and above to
+    standard error. Also used as the initializer of worker processes, which do
+    not inherit the configuration when they are spawned rather than forked.
+    """
+    logging.basicConfig(level=level, format="%(message)s")
+
+
+def _expected_output_file(filename):
     """
-    The main function parses command-line arguments and runs the conversion of a
-    Markdown or Jupyter notebook file to PDF using Pandoc with custom flags.
+    Predicts the output file ``convert_to_pdf`` will report for ``filename``
+    without running Pandoc, or ``None`` if it is left to Pandoc or cannot be
+    told, e.g. because the ``"output"`` metadata is not a string.
+    """
+    base, ext = os.path.splitext(filename)
+    if ext.lower() not in _NOTEBOOK_EXTENSIONS:
+        return None
+    output_file = extract_notebook_metadata(filename).get("output")
+    if output_file is None:
+        output_file = f"{base}.pdf"
+    elif not isinstance(output_file, str):
+        return None
+    return output_file
+
+
+def _warn_output_collisions(filenames):
+    """
+    Prints a warning for every output file that more than one of the given
+    inputs would be converted to.
+    """
+    outputs = {}
+    for filename in filenames:
+        output_file = _expected_output_file(filename)
+        if output_file is not None:
+            key = os.path.normcase(os.path.abspath(output_file))
+            outputs.setdefault(key, []).append(filename)
+    for output_file, inputs in outputs.items():
+        if len(inputs) > 1:
+            log.warning(
+                "Warning: %s all convert to %s", ", ".join(inputs), output_file
+            )
+
+
+@functools.lru_cache(maxsize=None)
+def _argument_parser():
+    """
+    Builds the command-line argument parser of ``main`` once per process.
     """
     parser = argparse.ArgumentParser(
         description="Convert a Markdown or Jupyter notebook file to PDF via "
         "Pandoc, including full notebook metadata and custom pandoc_args."
     )
     parser.add_argument(
-        "filename", help="The input file to convert (.md or .ipynb)."
+        "filename",
+        nargs="+",
+        help="The input file(s) to convert (.md or .ipynb).",
     )
     parser.add_argument(
         "--flags",
-        default="--pdf-engine=xelatex",
-        help="Extra Pandoc flags (default: --pdf-engine=xelatex).",
+        default=" ".join(_DEFAULT_FLAGS),
+        help="Extra Pandoc flags (default: %(default)s).",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of files to convert in parallel (default: number of "
+        "CPUs).",
+    )
+    parser.add_argument(
+        "--max-size",
+        type=int,
+        default=_DEFAULT_MAX_SIZE,
+        metavar="MIB",
+        help="Refuse inputs larger than this many MiB, 0 for no limit "
+        f"(default: {_DEFAULT_MAX_SIZE}).",
+    )
+    parser.add_argument(
+        "--draft",
+        action="store_true",
+        help="Faster, larger PDFs: run the LaTeX engine in batch mode and, "
+        "for XeLaTeX, without compression.",
+    )
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-v",
+        "--verbose",
+        action="store_const",
+        dest="log_level",
+        const=logging.DEBUG,
+        default=logging.INFO,
+        help="Also print the Pandoc command of every conversion.",
+    )
+    verbosity.add_argument(
+        "-q",
+        "--quiet",
+        action="store_const",
+        dest="log_level",
+        const=logging.WARNING,
+        help="Only print warnings and errors.",
     )
+    return parser
+
+
+def main():
+    """
+    The main function parses command-line arguments and runs the conversion of
+    one or more Markdown or Jupyter notebook files to PDF using Pandoc with
+    custom flags.
+
+    With ``--jobs 1``, all files are converted within a single process, so the
+    notebook metadata cache and the Pandoc lookup are shared between them.
+    Otherwise the files are spread over a pool of worker processes, since
+    every conversion is independent of the others. When several files are
+    given, a warning is printed for inputs that would overwrite each other's
+    output, and a per-file summary is printed at the end.
+
+    Returns
+    -------
+    int
+        The exit status, ``0`` if every file was converted, ``1`` otherwise.
+    """
+    parser = _argument_parser()
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.max_size < 0:
+        parser.error("--max-size must not be negative")
+    try:
+        flags = split_arguments(args.flags)
+    except ValueError as e:
+        parser.error(f"--flags: {e}")
+    _configure_logging(args.log_level)
+
+    sweep_stale_temp_dirs()
+
+    filenames = args.filename
+    if len(filenames) > 1:
+        _warn_output_collisions(filenames)
+
+    convert = functools.partial(
+        convert_to_pdf,
+        flags=flags,
+        max_size=args.max_size,
+        draft=args.draft,
+    )
+    jobs = min(args.jobs, len(filenames))
+    if jobs > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_configure_logging,
+            initargs=(args.log_level,),
+        ) as pool:
+            results = list(zip(filenames, pool.map(convert, filenames)))
+    else:
+        results = [(filename, convert(filename)) for filename in filenames]
+
+    if len(results) > 1:
+        log.info("Summary:")
+        for filename, ok in results:
+            log.info("  %-6s %s", "ok" if ok else "FAILED", filename)
 
-    convert_to_pdf(args.filename, args.flags)
+    return 0 if all(ok for _, ok in results) else 1
 
 
 if __name__ == "__main__":
-    main()
+    # In a PyInstaller build on Windows or macOS, the worker processes of
+    # ``--jobs`` re-run this executable; this hands them over to
+    # ``multiprocessing`` instead of letting them run ``main`` again.
+    multiprocessing.freeze_support()
+    sys.exit(main())